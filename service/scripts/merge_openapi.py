@@ -1,31 +1,144 @@
 # merge_openapi.py
 
 import os
+import contextlib
+import copy
+import functools
+import hashlib
+import json
+import math
+import pickle
+import shutil
 import yaml
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 import typer
 from openapi_spec_validator import validate_spec
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+# Prefer the libyaml-backed loader and dumper; fall back to the pure-Python ones
+# if PyYAML was built without libyaml.
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# orjson is optional; its C encoder canonicalizes schema subtrees much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Initialize a Typer app for command-line interface
 app = typer.Typer()
 
+# Conventional name of the merged specification, kept next to the service specs
+MERGED_SPEC_NAME = "merged_openapi.yml"
+
+# Function to locate the directory holding pickled parse results, keyed by absolute
+# path, mtime and size. It lives in the user's cache directory, and entries are
+# unpickled as-is, so it must only be writable by the user running the merge.
+# Returns None when there is no usable cache directory (no HOME and no passwd entry).
+def _cache_dir() -> Optional[Path]:
+    try:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    except (RuntimeError, KeyError):
+        return None
+    return Path(base) / "fountainai-mock" / "openapi"
+
+# Marker for a parse result that is not in the cache (a cached spec may itself be None)
+_NOT_CACHED = object()
+
+# Function to name the cache entry for a file, returning the entry and the prefix
+# shared by all entries for that file
+def _cache_file(path: Path, cache_dir: Path) -> Tuple[Path, str]:
+    stat = path.stat()
+    path_digest = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:16]
+    cache_prefix = f"{path.name}-{path_digest}-"
+    return cache_dir / f"{cache_prefix}{stat.st_mtime_ns}-{stat.st_size}.pkl", cache_prefix
+
+# Function to read a cached parse result; returns _NOT_CACHED on a miss
+# Parse results are reused until the file's mtime or size changes.
+def _read_cached(path: Path, cache_dir: Path):
+    cache_file, _ = _cache_file(path, cache_dir)
+    try:
+        return pickle.loads(cache_file.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return _NOT_CACHED
+
+# Function to parse a single OpenAPI file (runs inside worker processes)
+# Unless `cache_dir` is None, the result is written to the cache; writing a new entry
+# removes older entries for the same file.
+def _load_one(path: Path, cache_dir: Optional[Path] = None):
+    with open(path, 'rb') as f:
+        spec = yaml.load(f, Loader=SafeLoader)
+    if cache_dir is None:
+        return path.stem, spec
+    try:
+        cache_file, cache_prefix = _cache_file(path, cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_bytes(pickle.dumps(spec, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp_file, cache_file)
+        with os.scandir(cache_dir) as entries:
+            stale = [entry.path for entry in entries if entry.name.startswith(cache_prefix) and entry.name.endswith('.pkl') and entry.name != cache_file.name]
+        for stale_file in stale:
+            os.remove(stale_file)
+    except OSError:
+        pass
+    return path.stem, spec
+
 # Function to load OpenAPI files
-def load_openapi_files(input_directory: str) -> Dict[str, dict]:
+def load_openapi_files(input_directory: str, output_file: Optional[str] = None, use_cache: bool = True) -> Dict[str, dict]:
     """
     Load all OpenAPI files from the input directory.
     Supports both `.yml` and `.yaml` files.
+    A previously merged specification (`merged_openapi.yml` or the given
+    output file) is skipped so the tool never merges its own output.
+    Files are parsed with the safe (libyaml) loader, so YAML comments are
+    intentionally dropped; no round-trip loader is needed for merging.
+    Parse results are cached in the user's cache directory unless
+    `use_cache` is False. Cached files are read directly; the rest are
+    parsed in parallel when there are enough of them to amortize the cost
+    of starting worker processes.
     """
-    openapi_files = {}
-    for file in list(Path(input_directory).glob('*.yml')) + list(Path(input_directory).glob('*.yaml')):
+    try:
+        with os.scandir(input_directory) as entries:
+            paths = [Path(entry.path) for entry in entries if entry.is_file() and entry.name.endswith(('.yml', '.yaml'))]
+    except (FileNotFoundError, NotADirectoryError):
+        typer.secho(f"Error: The input directory '{input_directory}' does not exist.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    excluded = Path(output_file).resolve() if output_file else None
+    paths.sort()
+    spec_paths = []
+    for file in paths:
+        if file.name == MERGED_SPEC_NAME or file.resolve() == excluded:
+            typer.secho(f"Skipping merged specification: {file}", fg=typer.colors.YELLOW)
+            continue
         typer.secho(f"Loading file: {file}", fg=typer.colors.CYAN)
-        with open(file, 'r') as f:
-            openapi_files[file.stem] = yaml.safe_load(f)
+        spec_paths.append(file)
+    paths = spec_paths
+    cache_dir = _cache_dir() if use_cache else None
+    specs = {}
+    if cache_dir is not None:
+        for file in paths:
+            spec = _read_cached(file, cache_dir)
+            if spec is not _NOT_CACHED:
+                specs[file] = spec
+    misses = [file for file in paths if file not in specs]
+    load_one = functools.partial(_load_one, cache_dir=cache_dir)
+    if len(misses) < 4:
+        results = map(load_one, misses)
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(load_one, misses, chunksize=4))
+    specs.update((file, spec) for file, (_, spec) in zip(misses, results))
+    openapi_files = {file.stem: specs[file] for file in paths}
     typer.secho(f"Loaded {len(openapi_files)} OpenAPI files.", fg=typer.colors.GREEN)
     return openapi_files
 
 # Function to merge multiple OpenAPI specifications into a single unified specification
-def merge_openapi_files(openapi_files: Dict[str, dict]) -> dict:
+def merge_openapi_files(openapi_files: Dict[str, dict], verbose: bool = False) -> dict:
     merged_spec = {
         "openapi": "3.1.0",
         "info": {
@@ -45,56 +158,314 @@ def merge_openapi_files(openapi_files: Dict[str, dict]) -> dict:
             "requestBodies": {},
         }
     }
+    # Tags are deduplicated by name; the list is materialized once at the end
+    merged_tags: Dict[str, dict] = {}
+    # Names of merged components, keyed by component type and canonical encoding
+    content_index: Dict[str, Dict[bytes, str]] = {}
 
     for service_name, spec in openapi_files.items():
-        typer.secho(f"Merging paths for service: {service_name}", fg=typer.colors.CYAN)
-        merge_paths(service_name, spec, merged_spec)
-        typer.secho(f"Merging components for service: {service_name}", fg=typer.colors.CYAN)
-        merge_components(service_name, spec, merged_spec)
-        typer.secho(f"Merging tags for service: {service_name}", fg=typer.colors.CYAN)
-        merge_tags(service_name, spec, merged_spec)
+        # Components are merged first so that paths pick up rewritten $refs
+        if verbose:
+            typer.secho(f"Merging components for service: {service_name}", fg=typer.colors.CYAN)
+        added_components, skipped_components, conflicts = merge_components(service_name, spec, merged_spec, content_index, verbose)
+        if verbose:
+            typer.secho(f"Merging paths for service: {service_name}", fg=typer.colors.CYAN)
+        added_paths, skipped_paths = merge_paths(service_name, spec, merged_spec, verbose)
+        if verbose:
+            typer.secho(f"Merging tags for service: {service_name}", fg=typer.colors.CYAN)
+        added_tags = merge_tags(service_name, spec, merged_tags, verbose)
+        if not verbose:
+            typer.secho(
+                f"Merged {service_name}: {added_paths} paths added, {skipped_paths} skipped; "
+                f"{added_components} components added, {skipped_components} skipped, {conflicts} conflicts; "
+                f"{added_tags} tags added.",
+                fg=typer.colors.CYAN,
+            )
 
+    merged_spec["tags"] = list(merged_tags.values())
     typer.secho("Successfully merged all OpenAPI files.", fg=typer.colors.GREEN)
     return merged_spec
 
 # Function to merge paths into the unified specification
-def merge_paths(service_name: str, spec: dict, merged_spec: dict) -> None:
-    for path, path_item in spec.get("paths", {}).items():
-        if path in merged_spec["paths"]:
-            typer.secho(f"Warning: Duplicate un-prefixed path detected for {path}. Skipping.", fg=typer.colors.YELLOW)
-            continue
-        prefixed_path = f"/{service_name}{path}"
-        if prefixed_path not in merged_spec["paths"]:
-            merged_spec["paths"][prefixed_path] = path_item
-            typer.secho(f"Added path: {prefixed_path}", fg=typer.colors.GREEN)
+# Returns the number of added and skipped paths.
+def merge_paths(service_name: str, spec: dict, merged_spec: dict, verbose: bool = False) -> Tuple[int, int]:
+    prefixed = {f"/{service_name}{path}": path_item for path, path_item in spec.get("paths", {}).items()}
+    duplicates = prefixed.keys() & merged_spec["paths"].keys()
+    if duplicates:
+        prefixed = {path: path_item for path, path_item in prefixed.items() if path not in duplicates}
+    merged_spec["paths"].update(prefixed)
+    if verbose:
+        for path in sorted(duplicates):
+            typer.secho(f"Warning: Duplicate path detected for {path}. Skipping.", fg=typer.colors.YELLOW)
+        for path in prefixed:
+            typer.secho(f"Added path: {path}", fg=typer.colors.GREEN)
+    return len(prefixed), len(duplicates)
+
+# Function to convert all mapping keys to strings, so mixed keys such as an
+# unquoted `200` next to `default` can be sorted
+def _str_keys(node):
+    if type(node) is dict:
+        return {str(key): _str_keys(value) for key, value in node.items()}
+    if type(node) is list:
+        return [_str_keys(item) for item in node]
+    return node
+
+# Function to encode YAML values that JSON has no type for (`!!binary`, `!!set`, ...)
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return {"!!set": sorted(value, key=repr)}
+    if isinstance(value, bytes):
+        return {"!!binary": value.hex()}
+    return str(value)
+
+# Function to check whether a subtree contains `.inf` or `.nan`, which orjson encodes as null
+def _has_non_finite_float(node) -> bool:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is float:
+            if not math.isfinite(node):
+                return True
+        elif node_type is dict:
+            stack.extend(node.values())
+        elif node_type is list:
+            stack.extend(node)
+    return False
+
+# Function to encode a component canonically so equal components compare equal as bytes
+# Non-string keys are encoded as strings, so `200` and `'200'` are deliberately treated
+# as the same key: OpenAPI keys are strings, and both spellings mean the same status code.
+# Values orjson rejects (integers beyond 64 bits, binary, sets) or would encode lossily
+# (non-finite floats) go through json, which keeps them distinct.
+def canonicalize_component(component: dict) -> bytes:
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(component, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except (orjson.JSONEncodeError, TypeError):
+            pass
         else:
-            typer.secho(f"Warning: Duplicate path detected for {prefixed_path}. Skipping.", fg=typer.colors.YELLOW)
+            if b"null" not in encoded or not _has_non_finite_float(component):
+                return encoded
+    return json.dumps(_str_keys(component), sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode()
+
+# Function to point $refs in a spec subtree at renamed components
+# Walks the tree with an explicit stack to avoid recursion limits on deep schemas.
+def rewrite_refs(node, remap: Dict[str, str]) -> None:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is dict:
+            for key, value in node.items():
+                if key == "$ref" and type(value) is str:
+                    node[key] = remap.get(value, value)
+                else:
+                    stack.append(value)
+        elif node_type is list:
+            stack.extend(node)
+
+# Function to collect the string $refs in a subtree
+def _collect_refs(node) -> set:
+    refs = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is dict:
+            for key, value in node.items():
+                if key == "$ref" and type(value) is str:
+                    refs.add(value)
+                else:
+                    stack.append(value)
+        elif node_type is list:
+            stack.extend(node)
+    return refs
+
+# Function to split a reference graph into strongly connected components (iterative Tarjan)
+# Groups are returned dependencies first: every group only references itself or earlier groups.
+def _strongly_connected_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack = set()
+    groups = []
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    group = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        group.append(member)
+                        if member == node:
+                            break
+                    groups.append(group)
+    return groups
 
 # Function to merge components into the unified specification
-def merge_components(service_name: str, spec: dict, merged_spec: dict) -> None:
+# Components are interned by content: a component identical to one already merged
+# (under any name) is not added again, and the service's $refs are rewritten to
+# point at the merged name. Conflicting components are added with a service prefix
+# and referenced by that name.
+# Two components are only identical if their own $refs end up at the same merged
+# components, so components are planned in dependency order, and each one is compared
+# with its references already remapped. Mutually referencing components are re-planned
+# together until their remap stops changing; if it cycles instead, they are merged by
+# name without reuse.
+# Rewriting happens in place on the service spec.
+# Returns the number of added, skipped and conflicting (prefixed) components.
+def merge_components(service_name: str, spec: dict, merged_spec: dict, content_index: Dict[str, Dict[bytes, str]], verbose: bool = False) -> Tuple[int, int, int]:
+    added = skipped = conflicts = 0
+    # Component info keyed by the $ref that points at it: (type, name, component, refs, bytes)
+    nodes: Dict[str, tuple] = {}
     for component_type, components in spec.get("components", {}).items():
         if component_type not in merged_spec["components"]:
             continue
         for name, component in components.items():
-            prefixed_name = f"{service_name}_{name}"
-            existing_component = merged_spec["components"][component_type].get(name)
-            if existing_component is None:
-                merged_spec["components"][component_type][name] = component
-                typer.secho(f"Added component: {component_type}/{name}", fg=typer.colors.GREEN)
-            elif existing_component != component:
-                if existing_component == component:
+            nodes[f"#/components/{component_type}/{name}"] = (component_type, name, component, _collect_refs(component), canonicalize_component(component))
+    graph = {key: [ref for ref in node[3] if ref in nodes] for key, node in nodes.items()}
+
+    remap: Dict[str, str] = {}
+    # Names and canonical bytes planned for this service so far, per component type
+    planned_names: Dict[str, set] = {}
+    planned_by_content: Dict[str, Dict[bytes, str]] = {}
+    # Planned entries: (type, name, component, canonical bytes, action, merged name)
+    plan: List[tuple] = []
+
+    def canonical_bytes(key: str, assumed: Dict[str, str]) -> bytes:
+        component_type, name, component, refs, base_bytes = nodes[key]
+        changed = {ref: assumed[ref] for ref in refs if ref in assumed}
+        if not changed:
+            return base_bytes
+        component = copy.deepcopy(component)
+        rewrite_refs(component, changed)
+        return canonicalize_component(component)
+
+    # Plans a group of components assuming the service's $refs are rewritten with `assumed`.
+    # Action is "reuse", "add", "prefix" or "taken" (the prefixed name holds a different component).
+    def plan_group(group: List[str], assumed: Dict[str, str], allow_reuse: bool = True):
+        entries = []
+        implied: Dict[str, str] = {}
+        group_names: Dict[str, set] = {}
+        group_by_content: Dict[str, Dict[bytes, str]] = {}
+        for key in group:
+            component_type, name, component = nodes[key][:3]
+            merged_components = merged_spec["components"][component_type]
+            names = planned_names.get(component_type, set())
+            new_names = group_names.setdefault(component_type, set())
+            new_by_content = group_by_content.setdefault(component_type, {})
+            canon_bytes = canonical_bytes(key, assumed)
+            merged_name = (content_index.get(component_type, {}).get(canon_bytes)
+                           or planned_by_content.get(component_type, {}).get(canon_bytes)
+                           or new_by_content.get(canon_bytes))
+            if allow_reuse and merged_name is not None:
+                action = "reuse"
+            elif name not in merged_components and name not in names and name not in new_names:
+                action, merged_name = "add", name
+            else:
+                merged_name = f"{service_name}_{name}"
+                taken = merged_name in merged_components or merged_name in names or merged_name in new_names
+                action = "taken" if taken else "prefix"
+            if action in ("add", "prefix"):
+                new_names.add(merged_name)
+                new_by_content.setdefault(canon_bytes, merged_name)
+            if merged_name != name:
+                implied[key] = f"#/components/{component_type}/{merged_name}"
+            entries.append((component_type, name, component, canon_bytes, action, merged_name))
+        return entries, implied
+
+    order = {key: position for position, key in enumerate(nodes)}
+    for group in _strongly_connected_components(graph):
+        group.sort(key=order.__getitem__)
+        members = set(group)
+        if any(ref in members for key in group for ref in graph[key]):
+            # The group's bytes depend on its own remap: iterate to a fixed point
+            guess: Dict[str, str] = {}
+            seen = []
+            while True:
+                entries, implied = plan_group(group, {**remap, **guess})
+                if implied == guess:
+                    break
+                if implied in seen:
+                    # Cycle: name-based plan, with bytes computed after the rewrite it implies
+                    _, implied = plan_group(group, remap, allow_reuse=False)
+                    entries, implied = plan_group(group, {**remap, **implied}, allow_reuse=False)
+                    break
+                seen.append(guess)
+                guess = implied
+        else:
+            entries, implied = plan_group(group, remap)
+        remap.update(implied)
+        for component_type, _, _, canon_bytes, action, merged_name in entries:
+            if action in ("add", "prefix"):
+                planned_names.setdefault(component_type, set()).add(merged_name)
+                planned_by_content.setdefault(component_type, {}).setdefault(canon_bytes, merged_name)
+        plan.extend(entries)
+
+    for component_type, name, _, _, action, merged_name in plan:
+        if action == "taken":
+            typer.secho(f"Error: Conflicting component {component_type}/{name} cannot be added as {component_type}/{merged_name}, which already holds a different component.", fg=typer.colors.RED)
+            raise typer.Exit(code=7)
+
+    if remap:
+        rewrite_refs(spec.get("paths", {}), remap)
+        rewrite_refs(spec.get("components", {}), remap)
+
+    plan.sort(key=lambda entry: order[f"#/components/{entry[0]}/{entry[1]}"])
+    for component_type, name, component, canon_bytes, action, merged_name in plan:
+        if action == "reuse":
+            skipped += 1
+            if verbose:
+                if merged_name == name:
                     typer.secho(f"Identical component already exists: {component_type}/{name}. Skipping.", fg=typer.colors.GREEN)
                 else:
-                    merged_spec["components"][component_type][prefixed_name] = component
-                    typer.secho(f"Conflict detected. Added component with prefixed name: {component_type}/{prefixed_name}", fg=typer.colors.YELLOW)
+                    typer.secho(f"Identical component already exists as {component_type}/{merged_name}. Reusing it for {component_type}/{name}.", fg=typer.colors.GREEN)
+            continue
+        merged_spec["components"][component_type][merged_name] = component
+        content_index.setdefault(component_type, {}).setdefault(canon_bytes, merged_name)
+        if action == "add":
+            added += 1
+            if verbose:
+                typer.secho(f"Added component: {component_type}/{name}", fg=typer.colors.GREEN)
+        else:
+            conflicts += 1
+            if verbose:
+                typer.secho(f"Conflict detected. Added component with prefixed name: {component_type}/{merged_name}", fg=typer.colors.YELLOW)
+    return added, skipped, conflicts
 
 # Function to merge tags into the unified specification
-def merge_tags(service_name: str, spec: dict, merged_spec: dict) -> None:
-    if "tags" in spec:
-        for tag in spec["tags"]:
-            if tag not in merged_spec["tags"]:
-                merged_spec["tags"].append(tag)
+# Returns the number of added tags.
+def merge_tags(service_name: str, spec: dict, merged_tags: Dict[str, dict], verbose: bool = False) -> int:
+    added = 0
+    for tag in spec.get("tags", []):
+        if tag["name"] not in merged_tags:
+            merged_tags[tag["name"]] = tag
+            added += 1
+            if verbose:
                 typer.secho(f"Added tag: {tag}", fg=typer.colors.GREEN)
+    return added
 
 # Function to validate the merged OpenAPI specification
 def validate_openapi(openapi_spec: dict):
@@ -106,22 +477,45 @@ def validate_openapi(openapi_spec: dict):
         typer.secho(f"Validation Error: {e}", fg=typer.colors.RED)
         raise typer.Exit(code=3)
 
+# Function to wait for a pending validation, so that its messages come before a write error
+def _wait_for_validation(validation: Optional[Future]) -> None:
+    if validation is not None:
+        validation.exception()
+
 # Function to write the merged OpenAPI specification to a file
-def write_output(output_file: str, openapi_spec: dict):
+# The spec is written to a temporary file next to the output (following symlinks, and
+# keeping the mode of an existing output), which only replaces the output once the
+# (optional) pending validation has succeeded.
+def write_output(output_file: str, openapi_spec: dict, validation: Optional[Future] = None):
+    output_path = os.path.realpath(output_file)
+    tmp_file = f"{output_path}.{os.getpid()}.tmp"
     try:
         typer.secho(f"Writing output to file: {output_file}", fg=typer.colors.CYAN)
-        with open(output_file, 'w') as f:
-            yaml.safe_dump(openapi_spec, f, sort_keys=False, default_flow_style=False)
+        with open(tmp_file, 'wb', buffering=1 << 20) as f:
+            yaml.dump(openapi_spec, f, Dumper=SafeDumper, sort_keys=False, default_flow_style=False, allow_unicode=True, encoding='utf-8', width=10_000_000)
+        with contextlib.suppress(FileNotFoundError):
+            shutil.copymode(output_path, tmp_file)
+        if validation is not None:
+            validation.result()
+        os.replace(tmp_file, output_path)
         typer.secho(f"Successfully wrote output to {output_file}", fg=typer.colors.GREEN)
+    except typer.Exit:
+        raise
     except FileNotFoundError:
+        _wait_for_validation(validation)
         typer.secho(f"Error: The directory for the output file '{output_file}' does not exist.", fg=typer.colors.RED)
         raise typer.Exit(code=4)
     except PermissionError:
+        _wait_for_validation(validation)
         typer.secho(f"Error: Permission denied when writing to the output file '{output_file}'.", fg=typer.colors.RED)
         raise typer.Exit(code=5)
     except Exception as e:
+        _wait_for_validation(validation)
         typer.secho(f"Unexpected error when writing to the output file: {e}", fg=typer.colors.RED)
         raise typer.Exit(code=6)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_file)
 
 # Typer command to run the script
 @app.command()
@@ -130,23 +524,28 @@ def merge_openapi(
     output_file: str = typer.Option("mock_server_openapi.yml", "--output-file", help="Path to the output YAML file for the unified specification."),
     validate_spec: bool = typer.Option(True, "--validate/--no-validate", help="Enable or disable validation of the final OpenAPI document."),
     verbose: bool = typer.Option(False, "--verbose", help="Verbose output, providing step-by-step details of the merging process."),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="Enable or disable the on-disk cache of parsed OpenAPI files."),
 ):
     if verbose:
         typer.secho("Loading OpenAPI files...", fg=typer.colors.GREEN)
-    openapi_files = load_openapi_files(input_directory)
+    openapi_files = load_openapi_files(input_directory, output_file, use_cache)
 
     if verbose:
         typer.secho(f"Merging {len(openapi_files)} OpenAPI files...", fg=typer.colors.GREEN)
-    merged_spec = merge_openapi_files(openapi_files)
+    merged_spec = merge_openapi_files(openapi_files, verbose)
 
-    if validate_spec:
-        if verbose:
-            typer.secho("Validating merged OpenAPI specification...", fg=typer.colors.GREEN)
-        validate_openapi(merged_spec)
+    # Validate on a worker thread while the main thread serializes the output; the
+    # overlap is modest since both hold the GIL for much of their work
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        validation = None
+        if validate_spec:
+            if verbose:
+                typer.secho("Validating merged OpenAPI specification...", fg=typer.colors.GREEN)
+            validation = executor.submit(validate_openapi, merged_spec)
 
-    if verbose:
-        typer.secho(f"Writing merged OpenAPI specification to {output_file}...", fg=typer.colors.GREEN)
-    write_output(output_file, merged_spec)
+        if verbose:
+            typer.secho(f"Writing merged OpenAPI specification to {output_file}...", fg=typer.colors.GREEN)
+        write_output(output_file, merged_spec, validation)
 
     if verbose:
         typer.secho("Merging process completed successfully.", fg=typer.colors.BLUE)
@@ -0,0 +1,283 @@
+# test_merge_openapi.py
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import typer
+import yaml
+from typer.testing import CliRunner
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import merge_openapi  # noqa: E402
+from merge_openapi import canonicalize_component, merge_openapi_files  # noqa: E402
+
+
+def ref(name: str) -> dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def service(schemas: dict, paths: dict) -> dict:
+    return {"openapi": "3.1.0", "paths": paths, "components": {"schemas": schemas}}
+
+
+def get_response(schema: dict) -> dict:
+    return {"get": {"responses": {"200": {"description": "OK", "content": {"application/json": {"schema": schema}}}}}}
+
+
+def response_schema(merged: dict, path: str) -> dict:
+    return merged["paths"][path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+
+def test_textually_identical_component_with_conflicting_ref_target_is_kept_separate():
+    def wrapper():
+        return {"type": "object", "properties": {"err": ref("Error")}}
+
+    merged = merge_openapi_files({
+        "A": service(
+            {"Error": {"type": "object", "properties": {"code": {"type": "integer"}}}, "Wrapper": wrapper()},
+            {"/y": get_response(ref("Wrapper"))},
+        ),
+        "B": service(
+            {"Error": {"type": "object", "properties": {"message": {"type": "string"}}}, "Wrapper": wrapper()},
+            {"/y": get_response(ref("Wrapper"))},
+        ),
+    })
+
+    schemas = merged["components"]["schemas"]
+    assert set(schemas) == {"Error", "Wrapper", "B_Error", "B_Wrapper"}
+    assert schemas["Wrapper"]["properties"]["err"] == ref("Error")
+    assert schemas["B_Wrapper"]["properties"]["err"] == ref("B_Error")
+    assert response_schema(merged, "/A/y") == ref("Wrapper")
+    assert response_schema(merged, "/B/y") == ref("B_Wrapper")
+
+
+def test_components_identical_after_remapping_are_interned():
+    merged = merge_openapi_files({
+        "A": service(
+            {"Error": {"type": "string"}, "Foo": {"type": "object", "properties": {"err": ref("Error")}}},
+            {"/x": get_response(ref("Foo"))},
+        ),
+        "B": service(
+            {"Err": {"type": "string"}, "Foo": {"type": "object", "properties": {"err": ref("Err")}}},
+            {"/x": get_response(ref("Foo"))},
+        ),
+    })
+
+    assert set(merged["components"]["schemas"]) == {"Error", "Foo"}
+    assert response_schema(merged, "/B/x") == ref("Foo")
+
+
+def test_self_referencing_conflict_does_not_leak_into_later_services():
+    def service_with_wrapper():
+        return service(
+            {"B_C": {"type": "integer"}, "A_A": {"type": "object", "properties": {"p0": ref("B_C")}}},
+            {"/A_A": get_response(ref("A_A"))},
+        )
+
+    merged = merge_openapi_files({
+        "S0": service_with_wrapper(),
+        "S1": service({"B_C": {"type": "object", "properties": {"p0": ref("B_C")}}}, {"/B_C": get_response(ref("B_C"))}),
+        "S2": service_with_wrapper(),
+    })
+
+    schemas = merged["components"]["schemas"]
+    assert set(schemas) == {"B_C", "A_A", "S1_B_C"}
+    assert schemas["S1_B_C"]["properties"]["p0"] == ref("S1_B_C")
+    assert response_schema(merged, "/S1/B_C") == ref("S1_B_C")
+    assert response_schema(merged, "/S2/A_A") == ref("A_A")
+
+
+def test_identical_recursive_components_are_interned():
+    def tree():
+        return service({"Node": {"type": "object", "properties": {"children": {"type": "array", "items": ref("Node")}}}}, {})
+
+    merged = merge_openapi_files({"A": tree(), "B": tree()})
+
+    assert set(merged["components"]["schemas"]) == {"Node"}
+
+
+def test_conflict_at_the_end_of_a_deep_ref_chain_prefixes_the_whole_chain():
+    def chain(leaf_type: str, length: int = 500):
+        schemas = {"S0": {"type": leaf_type}}
+        for i in range(1, length):
+            schemas[f"S{i}"] = {"type": "object", "properties": {"child": ref(f"S{i - 1}")}}
+        return service(schemas, {"/top": get_response(ref(f"S{length - 1}"))})
+
+    merged = merge_openapi_files({"A": chain("integer"), "B": chain("string"), "C": chain("integer")})
+
+    schemas = merged["components"]["schemas"]
+    assert len(schemas) == 1000
+    assert schemas["B_S1"]["properties"]["child"] == ref("B_S0")
+    assert response_schema(merged, "/B/top") == ref("B_S499")
+    assert response_schema(merged, "/C/top") == ref("S499")
+
+
+def test_taken_prefixed_name_fails_loudly():
+    with pytest.raises(typer.Exit) as excinfo:
+        merge_openapi_files({
+            "A": service({"Error": {"type": "string"}, "B_Error": {"type": "integer"}}, {}),
+            "B": service({"Error": {"type": "boolean"}}, {}),
+        })
+    assert excinfo.value.exit_code == 7
+
+
+def test_json_fallback_canonicalizes_mixed_keys(monkeypatch):
+    monkeypatch.setattr(merge_openapi, "orjson", None)
+    component = {"responses": {200: {"description": "OK"}, "default": {"description": "Error"}}}
+    assert canonicalize_component(component) == b'{"responses":{"200":{"description":"OK"},"default":{"description":"Error"}}}'
+
+
+def test_cache_distinguishes_same_named_files_in_different_directories(tmp_path):
+    cache_dir = tmp_path / "cache"
+    first, second = tmp_path / "a" / "svc.yml", tmp_path / "b" / "svc.yml"
+    for path, title in ((first, "first"), (second, "other")):
+        path.parent.mkdir()
+        path.write_text(f"info:\n  title: {title}\n")
+    stat = first.stat()
+    os.utime(second, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    merge_openapi._load_one(first, cache_dir)
+    assert merge_openapi._read_cached(first, cache_dir) == {"info": {"title": "first"}}
+    assert merge_openapi._read_cached(second, cache_dir) is merge_openapi._NOT_CACHED
+
+
+def test_cache_prunes_stale_entries_for_the_same_file(tmp_path):
+    cache_dir = tmp_path / "cache"
+    path = tmp_path / "svc.yml"
+    path.write_text("info:\n  title: old\n")
+    merge_openapi._load_one(path, cache_dir)
+    path.write_text("info:\n  title: newer\n")
+    merge_openapi._load_one(path, cache_dir)
+
+    assert merge_openapi._read_cached(path, cache_dir) == {"info": {"title": "newer"}}
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+@pytest.mark.parametrize("value", [2**64, b"\x00binary", {"a", "b"}, float("inf"), float("nan")])
+def test_canonicalize_handles_values_orjson_cannot_encode(value):
+    assert canonicalize_component({"maximum": value}) == canonicalize_component({"maximum": value})
+
+
+def test_non_finite_floats_are_not_interned_with_null():
+    merged = merge_openapi_files({
+        "A": service({"Limit": {"type": "number", "maximum": float("inf")}}, {}),
+        "B": service({"Limit": {"type": "number", "maximum": None}}, {}),
+    })
+
+    schemas = merged["components"]["schemas"]
+    assert set(schemas) == {"Limit", "B_Limit"}
+    assert schemas["B_Limit"]["maximum"] is None
+
+
+def test_cache_is_skipped_without_a_home_directory(monkeypatch):
+    def no_home():
+        raise RuntimeError("Could not determine home directory.")
+
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.setattr(Path, "home", no_home)
+    assert merge_openapi._cache_dir() is None
+
+
+def test_no_cache_leaves_cache_directory_untouched(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    (tmp_path / "specs").mkdir()
+    (tmp_path / "specs" / "svc.yml").write_text("info:\n  title: svc\n")
+
+    assert merge_openapi.load_openapi_files(str(tmp_path / "specs"), use_cache=False) == {"svc": {"info": {"title": "svc"}}}
+    assert not (tmp_path / "cache").exists()
+
+
+def test_cached_files_are_not_sent_to_the_process_pool(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    specs = tmp_path / "specs"
+    specs.mkdir()
+    for i in range(5):
+        (specs / f"svc{i}.yml").write_text(f"info:\n  title: svc{i}\n")
+    expected = merge_openapi.load_openapi_files(str(specs))
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started for cached files")
+
+    monkeypatch.setattr(merge_openapi, "ProcessPoolExecutor", no_pool)
+    assert merge_openapi.load_openapi_files(str(specs)) == expected
+
+
+def write_spec(directory: Path, name: str, operation_id: str = "getItems") -> None:
+    directory.mkdir(exist_ok=True)
+    spec = {
+        "openapi": "3.1.0",
+        "info": {"title": name, "version": "1.0.0"},
+        "paths": {"/items": {"get": {"operationId": operation_id, "responses": {"200": {"description": "OK"}}}}},
+    }
+    (directory / f"{name}.yml").write_text(yaml.safe_dump(spec))
+
+
+def run_cli(*args: str):
+    return CliRunner().invoke(merge_openapi.app, [*args, "--no-cache"])
+
+
+def test_invalid_spec_exits_3_and_keeps_previous_output(tmp_path):
+    specs = tmp_path / "specs"
+    write_spec(specs, "One")
+    write_spec(specs, "Two")
+    output = tmp_path / "out.yml"
+    output.write_bytes(b"previous: output\n")
+
+    result = run_cli("--input-directory", str(specs), "--output-file", str(output))
+
+    assert result.exit_code == 3
+    assert output.read_bytes() == b"previous: output\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["out.yml", "specs"]
+
+
+def test_output_keeps_symlink_and_mode(tmp_path):
+    specs = tmp_path / "specs"
+    write_spec(specs, "One", "getOne")
+    write_spec(specs, "Two", "getTwo")
+    target = tmp_path / "target.yml"
+    target.write_text("previous: output\n")
+    target.chmod(0o640)
+    output = tmp_path / "out.yml"
+    output.symlink_to(target)
+
+    result = run_cli("--input-directory", str(specs), "--output-file", str(output))
+
+    assert result.exit_code == 0, result.output
+    assert output.is_symlink()
+    assert set(yaml.safe_load(target.read_text())["paths"]) == {"/One/items", "/Two/items"}
+    assert target.stat().st_mode & 0o777 == 0o640
+
+
+def test_missing_input_directory_exits_1(tmp_path):
+    result = run_cli("--input-directory", str(tmp_path / "missing"), "--output-file", str(tmp_path / "out.yml"))
+
+    assert result.exit_code == 1
+    assert "does not exist" in result.output
+    assert not (tmp_path / "out.yml").exists()
+
+
+def test_previous_merged_output_and_output_target_are_not_loaded(tmp_path):
+    specs = tmp_path / "specs"
+    write_spec(specs, "One", "getOne")
+    write_spec(specs, "Two", "getTwo")
+    for name in ("merged_openapi", "current"):
+        write_spec(specs, name, "getOne")
+
+    loaded = merge_openapi.load_openapi_files(str(specs), str(specs / "current.yml"), use_cache=False)
+    result = run_cli("--input-directory", str(specs), "--output-file", str(specs / "current.yml"))
+
+    assert set(loaded) == {"One", "Two"}
+    assert result.exit_code == 0, result.output
+    assert set(yaml.safe_load((specs / "current.yml").read_text())["paths"]) == {"/One/items", "/Two/items"}
+
+
+def test_bundled_specs_merge_and_validate(tmp_path):
+    bundled = Path(__file__).resolve().parents[1] / "openapi"
+
+    result = run_cli("--input-directory", str(bundled), "--output-file", str(tmp_path / "merged.yml"))
+
+    assert result.exit_code == 0, result.output
+    assert "Skipping merged specification" in result.output